@@ -1,6 +1,7 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -8,14 +9,14 @@ from backend.app import crud, schemas
 from backend.app.api import deps
 from backend.app.db import models
 from backend.app.schemas.request_params import RequestParams
+from backend.app.utils.responses import serialize_orm, paginated_response
 
 router = APIRouter()
 
 
 # noinspection PyUnusedLocal
-@router.get("/", response_model=List[schemas.StudentTask])
+@router.get("/", response_class=ORJSONResponse, responses={200: {"model": List[schemas.StudentTask]}})
 async def read_task_students(
-        response: Response,
         db: AsyncSession = Depends(deps.get_db),
         current_user: models.User = Depends(deps.get_current_active_user),
         request_params: RequestParams = Depends(deps.parse_react_admin_params(models.StudentTask))
@@ -24,8 +25,7 @@ async def read_task_students(
     Retrieve Tasks.
     """
     items, total = await crud.student_task.get_multi(db, request_params=request_params)
-    response.headers["Content-Range"] = f"{request_params.skip}-{request_params.skip + len(items)}/{total}"
-    return items
+    return paginated_response(items, schemas.StudentTask, request_params.skip, total)
 
 
 # noinspection PyUnusedLocal
@@ -55,15 +55,14 @@ async def update_task_student_id(
     """
     Update an task.
     """
-    item = await crud.student_task.get(db=db, id=id)
+    item = await crud.student_task.update_by_id(db=db, id=id, obj_in=item_in)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    item = await crud.student_task.update(db=db, db_obj=item, obj_in=item_in)
     return item
 
 
 # noinspection PyUnusedLocal
-@router.get("/{id}", response_model=schemas.StudentTask)
+@router.get("/{id}", response_class=ORJSONResponse, responses={200: {"model": schemas.StudentTask}})
 async def read_task_student_id(
         *,
         db: AsyncSession = Depends(deps.get_db),
@@ -76,7 +75,7 @@ async def read_task_student_id(
     item = await crud.student_task.get(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    return ORJSONResponse(serialize_orm(item, schemas.StudentTask))
 
 
 # noinspection PyUnusedLocal
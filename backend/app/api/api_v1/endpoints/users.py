@@ -1,24 +1,25 @@
+from difflib import SequenceMatcher
 from typing import Any, List
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Response
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.params import Query
-from fastapi.responses import FileResponse
-from pydantic.networks import EmailStr
+from fastapi.responses import FileResponse, ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app import crud, schemas
 from backend.app.api import deps
 from backend.app.db import models, classifiers
 from backend.app.schemas.request_params import RequestParams
+from backend.app.utils.responses import serialize_orm, paginated_response
 
 router = APIRouter()
 
+user_roles = frozenset(classifiers.UserRole.to_list())
+
 
 # noinspection PyUnusedLocal
-@router.get("/", response_model=List[schemas.User])
+@router.get("/", response_class=ORJSONResponse, responses={200: {"model": List[schemas.User]}})
 async def read_users(
-        response: Response,
         db: AsyncSession = Depends(deps.get_db),
         current_user: models.User = Depends(deps.get_current_active_user),
         request_params: RequestParams = Depends(deps.parse_react_admin_params(models.User))
@@ -27,8 +28,7 @@ async def read_users(
     Retrieve users.
     """
     users, total = await crud.user.get_multi(db, request_params)
-    response.headers["Content-Range"] = f"{request_params.skip}-{request_params.skip + len(users)}/{total}"
-    return users
+    return paginated_response(users, schemas.User, request_params.skip, total)
 
 
 # noinspection PyUnusedLocal
@@ -62,27 +62,23 @@ async def create_user(
 async def update_user_me(
         *,
         db: AsyncSession = Depends(deps.get_db),
-        password: str = Body(None),
-        email: EmailStr = Body(None),
+        user_in: schemas.UserUpdateMe,
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update own user.
     """
-    current_user_data = jsonable_encoder(current_user)
-    user_in = schemas.UserUpdate(**current_user_data)
-    if password:
-        user_in.password = password
-    if email:
-        user_in.email = email
-    user = await crud.user.update(db, db_obj=current_user, obj_in=user_in)
+    update_data = user_in.dict(exclude_unset=True, exclude_none=True)
+    if update_data.get('password') and \
+            SequenceMatcher(None, current_user.username, update_data['password']).ratio() >= 0.5:
+        raise HTTPException(400, 'Password must not match username')
+    user = await crud.user.update_by_id(db, id=current_user.id, obj_in=update_data)
     return user
 
 
 # noinspection PyUnusedLocal
-@router.get("/me", response_model=schemas.User)
+@router.get("/me", response_class=ORJSONResponse, responses={200: {"model": schemas.User}})
 async def read_user_me(
-        response: Response,
         db: AsyncSession = Depends(deps.get_db),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -90,12 +86,11 @@ async def read_user_me(
     Get current user.
     """
     user = await crud.user.get(db, id=current_user.id)
-    response.headers["Content-Range"] = f"{0}-{1}/{1}"
-    return user
+    return ORJSONResponse(serialize_orm(user, schemas.User), headers={"Content-Range": f"{0}-{1}/{1}"})
 
 
 # noinspection PyUnusedLocal
-@router.get("/{id}", response_model=schemas.User)
+@router.get("/{id}", response_class=ORJSONResponse, responses={200: {"model": schemas.User}})
 async def read_user_by_id(
         id: int,
         current_user: models.User = Depends(deps.get_current_active_user),
@@ -105,7 +100,9 @@ async def read_user_by_id(
     Get a specific user by id.
     """
     user = await crud.user.get(db, id=id)
-    return user
+    if not user:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return ORJSONResponse(serialize_orm(user, schemas.User))
 
 
 # noinspection PyUnusedLocal
@@ -141,13 +138,12 @@ async def update_user(
     """
     Update a user.
     """
-    user = await crud.user.get(db, id=id)
+    user = await crud.user.update_by_id(db, id=id, obj_in=user_in)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="The user with this username does not exist in the system",
         )
-    user = await crud.user.update(db, db_obj=user, obj_in=user_in)
     return user
 
 
@@ -162,25 +158,24 @@ async def delete_user(
     """
     Delete an task.
     """
+    item = await crud.user.remove_where(db=db, id=id, is_active=False, is_superuser=False)
+    if item:
+        return item
+    # nothing deleted, look the user up only to report why
     item = await crud.user.get(db=db, id=id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if item.is_active:
         raise HTTPException(status_code=404, detail="Acive user cannot be removed")
-    if item.is_superuser:
-        raise HTTPException(status_code=404, detail="Superuser cannot be removed")
-
-    item = await crud.user.remove(db=db, id=id)
-    return item
+    raise HTTPException(status_code=404, detail="Superuser cannot be removed")
 
 
 # ----------------------------------------------------------------------------------------------------------------------
 
 
 # noinspection PyUnusedLocal
-@router.get("/role/{rolname}", response_model=List[schemas.User])
+@router.get("/role/{rolname}", response_class=ORJSONResponse, responses={200: {"model": List[schemas.User]}})
 async def read_users_by_role_id(
-        response: Response,
         db: AsyncSession = Depends(deps.get_db),
         current_user: models.User = Depends(deps.get_current_active_user),
         request_params: schemas.RequestParams = Depends(deps.parse_react_admin_params(models.User)),
@@ -189,15 +184,10 @@ async def read_users_by_role_id(
     """
     Retrieve users.
     """
-    roles = None
-
-    if rolname in classifiers.UserRole.to_list():
-        roles = [rolname]
-    elif not roles:
+    if rolname not in user_roles:
         raise HTTPException(404, 'role not set')
-    user, total = await crud.user.get_multi_with_role(db, request_params, roles)
-    response.headers["Content-Range"] = f"{request_params.skip}-{request_params.skip + len(user)}/{total}"
-    return user
+    user, total = await crud.user.get_multi_with_role(db, request_params, [rolname])
+    return paginated_response(user, schemas.User, request_params.skip, total)
 
 
 # noinspection PyUnusedLocal
@@ -213,11 +203,10 @@ async def update_user_by_role(
     """
     Update a user by role.
     """
-    user = await crud.user.get_by_id(db, id=id)
+    user = await crud.user.update_by_id(db, id=id, obj_in=user_in)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="The user with this username does not exist in the system",
         )
-    user = await crud.user.update(db, db_obj=user, obj_in=user_in)
     return user
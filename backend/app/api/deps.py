@@ -1,24 +1,31 @@
-import json
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Callable, Any, AsyncGenerator
 
+import orjson
 from asyncpg import Connection
+from cachetools import TTLCache
 from fastapi import Depends, status
 from fastapi.logger import logger
 from fastapi import HTTPException, Query
-from jose import jwt, JWTError
-from sqlalchemy import asc, desc, text, and_
+from jwt import PyJWTError
+from sqlalchemy import asc, desc, text, and_, func
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import DeclarativeMeta
 
 from backend.app import crud, schemas
 from backend.app.core.config import settings
-from backend.app.core.security import oauth2Scheme
+from backend.app.core.security import oauth2Scheme, decode_access_token
 from backend.app.db import User, classifiers
-from backend.app.db.session import AsyncSessionFactory
+from backend.app.db.session import AsyncSessionFactory, pg_identifier_preparer, set_session_user_q
 from backend.app.schemas.request_params import RequestParams
 
+# database roles recently seen to exist, so the pg_roles lookup runs once per user per hour at most
+db_roles_cache: TTLCache = TTLCache(maxsize=10000, ttl=3600)
+
+# escapes LIKE wildcards so filter values match literally
+like_escape_table = str.maketrans({'\\': '\\\\', '%': '\\%', '_': '\\_'})
 
 
 async def get_db() -> AsyncGenerator:
@@ -37,18 +44,11 @@ async def get_current_user_async(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-            options={"verify_aud": False},
-        )
-        subject: str = payload.get("sub")
-        scopes: str = payload.get("scopes")
+        subject, scopes = decode_access_token(token)
         if not subject:
             raise credentials_exception
         token_data = schemas.TokenPayload(sub=subject, scopes=scopes)
-    except JWTError:
+    except PyJWTError:
         raise credentials_exception
     if not token_data.sub.isdigit():
         raise credentials_exception
@@ -57,75 +57,59 @@ async def get_current_user_async(
         raise credentials_exception
 
     db_user = user.username
-    await get_session_user(db)
-    await reset_session_user(db)
-    await get_session_user(db)
-    check_result = await check_rolname(db, db_user, user)
-    if not check_result:
-        await create_user_in_role(db, user, db_user)
-    await reset_session_user(db)
-    await get_session_user(db)
+    await ensure_user_in_role(db, user, db_user)
     await set_session_user(db, db_user)
     await get_session_user(db)
+    # the user was loaded before the role was set, keep it out of the identity map
+    # so later reads of this row run a SELECT under the caller's privileges
+    db.expunge(user)
     return user
 
 
-async def check_rolname(db: AsyncSession, db_user: str, current_user: User):
+async def ensure_user_in_role(db: AsyncSession, current_user: User, db_user: str):
     if not current_user.is_active:
         raise HTTPException(400, 'user is not active')
     if not current_user.username == db_user:
         raise HTTPException(400, 'username not valid')
-    check_q = """select rolname from pg_roles where rolname = :db_user"""
-    check_q_result: Result = await db.execute(text(check_q), {'db_user': db_user.lower()})
-
-    check_result = check_q_result.fetchall()
-    if settings.debug:
-        logger.info(f"check_rolname: {f'{db_user} role exist' if check_result else f'{db_user} role not exist'}")
-    return check_result
-
-
-async def create_user_in_role(db: AsyncSession, current_user: User, db_user: str):
-    create_db_user_q = '''select create_user_in_role(:db_user, :hashed_password, :role)'''
+    if db_user.lower() in db_roles_cache:
+        return
+    ensure_db_user_q = '''select ensure_user_in_role(:db_user, :hashed_password, :role)'''
     params = {
         'db_user': db_user.lower(),
         'hashed_password': current_user.hashed_password,
         'role': current_user.role
     }
-    await db.execute(text(create_db_user_q), params=params)
+    await db.execute(text(ensure_db_user_q), params=params)
     await db.commit()
+    db_roles_cache[db_user.lower()] = True
     if settings.debug:
-        logger.info(f'CREATE_user_in_role: {create_db_user_q}')
+        logger.info(f'ENSURE_user_in_role: {db_user}')
 
 
 async def drop_user_in_role(db: AsyncSession | Connection, db_user: str):
-    drop_db_user_q = """drop user """ + db_user.lower()
+    drop_db_user_q = """drop user """ + pg_identifier_preparer.quote_identifier(db_user.lower())
     if isinstance(db, Connection):
         await db.execute(drop_db_user_q)
     elif isinstance(db, AsyncSession):
         await db.execute(text(drop_db_user_q))
+    db_roles_cache.pop(db_user.lower(), None)
     if settings.debug:
         logger.info(f'DROP_user_in_role: {db_user}')
 
 
 async def get_session_user(db: AsyncSession):
+    if not settings.debug:
+        return
     check_session_role_q = """select session_user, current_user"""
     check_session_role_q_result: Result = await db.execute(text(check_session_role_q))
-    if settings.debug:
-        logger.info(f'get_session_user: {check_session_role_q_result.scalar()}')
+    logger.info(f'get_session_user: {check_session_role_q_result.scalar()}')
 
 
 async def set_session_user(db: AsyncSession, db_user: str):
-    set_db_user_q = """set session authorization """ + db_user.lower()
     if settings.debug:
         logger.info(f'SET_session_user: {db_user}')
-    await db.execute(text(set_db_user_q))
-
-
-async def reset_session_user(db: AsyncSession):
-    reset_q = '''reset session authorization'''
-    if settings.debug:
-        logger.info(f'RESET_session_user')
-    await db.execute(text(reset_q))
+    await db.execute(text(set_session_user_q(db_user)))
+    db.sync_session.info['db_user'] = db_user.lower()
 
 
 async def get_current_active_user(
@@ -146,8 +130,12 @@ async def get_current_active_superuser(
     return current_user
 
 
+@lru_cache(maxsize=None)
 def parse_react_admin_params(model: DeclarativeMeta | Any) -> Callable[[str | None, str | None], RequestParams]:
     """Parses sort and range parameters coming from a react-admin request"""
+    cols = {c.name: c for c in model.__table__.c}
+    date_cols = {k for k in cols if k.split('_')[-1] == 'date'}
+    custom_type_cols = set(classifiers.pg_custom_type_colnames) & cols.keys()
 
     def inner(
             sort_: Optional[str] = Query(
@@ -171,44 +159,46 @@ def parse_react_admin_params(model: DeclarativeMeta | Any) -> Callable[[str | No
     ):
         skip, limit = 0, 50
         if range_:
-            start, end = json.loads(range_)
+            start, end = orjson.loads(range_)
             skip, limit = start, (end - start + 1)
 
         order_by = desc(model.id)
         if sort_:
-            sort_column, sort_order = json.loads(sort_)
+            sort_column, sort_order = orjson.loads(sort_)
             if sort_order.lower() == "asc":
                 direction = asc
             elif sort_order.lower() == "desc":
                 direction = desc
             else:
                 raise HTTPException(400, f"Invalid sort direction {sort_order}")
-            order_by = direction(model.__table__.c[sort_column])
+            order_by = direction(cols[sort_column])
         filter_by = None
         if filter_:
-            ft: dict = json.loads(filter_)
+            ft: dict = orjson.loads(filter_)
             if len(ft) > 0:
                 fb = []
-                filter_dict: dict = dict(filter(lambda it: str(it[0]).isdigit() is False, ft.items()))
+                filter_dict: dict = {k: v for k, v in ft.items() if not k.isdigit()}
                 for k, v in filter_dict.items():
                     if v is None:
-                        fb.append(model.__table__.c[k] == None)  # noqa
+                        fb.append(cols[k] == None)  # noqa
                     elif isinstance(v, str):
-                        if k in classifiers.pg_custom_type_colnames:
-                            fb.append(model.__table__.c[k] == v)
+                        if k in custom_type_cols:
+                            fb.append(cols[k] == v)
                         else:
-                            if str(k).split('_')[-1] == 'date':
-                                fb.append(model.__table__.c[k] >= datetime.fromisoformat(v))
+                            if k in date_cols:
+                                fb.append(cols[k] >= datetime.fromisoformat(v))
                             else:
-                                fb.append(model.__table__.c[k].ilike(f'{v}%'))
+                                # prefix match on lower(col) can use a text_pattern_ops index
+                                pattern = v.lower().translate(like_escape_table) + '%'
+                                fb.append(func.lower(cols[k]).like(pattern, escape='\\'))
                     elif isinstance(v, int):
-                        fb.append(model.__table__.c[k] == v)
+                        fb.append(cols[k] == v)
                     elif isinstance(v, list) and isinstance(v[0], list):
-                        fb.append(model.__table__.c[k].in_(tuple(v[0])))
+                        fb.append(cols[k].in_(tuple(v[0])))
                     elif isinstance(v, list):
                         if all(str(x).isdigit() for x in v):
                             v = [int(x) for x in v]
-                        fb.append(model.__table__.c[k].in_(tuple(v)))
+                        fb.append(cols[k].in_(tuple(v)))
                     else:
                         raise HTTPException(400, f"Invalid filters {filter_dict}")
                 if len(fb) > 0:
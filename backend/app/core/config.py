@@ -57,6 +57,13 @@ class Settings(BaseSettings):
         f"@{pg_host}:{env.str('PG_PORT')}" \
         f"/{env.str('PG_NAME')}"
 
+    # connection pool and statement caches of the async engine,
+    # set both cache sizes to 0 behind pgbouncer in transaction mode
+    PG_POOL_SIZE: int = env.int('PG_POOL_SIZE', default=20)
+    PG_MAX_OVERFLOW: int = env.int('PG_MAX_OVERFLOW', default=10)
+    PG_STATEMENT_CACHE_SIZE: int = env.int('PG_STATEMENT_CACHE_SIZE', default=1024)
+    PG_PREPARED_STATEMENT_CACHE_SIZE: int = env.int('PG_PREPARED_STATEMENT_CACHE_SIZE', default=512)
+
     FIRST_SUPERUSER_USERNAME: str = env.str('FIRST_SUPERUSER_USERNAME')
     FIRST_SUPERUSER_EMAIL: str = env.str('FIRST_SUPERUSER_EMAIL')
     FIRST_SUPERUSER_PASSWORD: str = env.str('FIRST_SUPERUSER_PASSWORD')
@@ -1,8 +1,10 @@
+import time
 from datetime import datetime, timedelta
-from typing import Union, Any, List
+from typing import Union, Any, List, Optional, Tuple
 
+import jwt
+from cachetools.func import ttl_cache
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from passlib.context import CryptContext
 
 from backend.app import schemas
@@ -23,11 +25,33 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode = {"expires_delta": str(expire), "sub": str(sub), "scopes": scopes}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode({**to_encode, "exp": expire}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
     token = schemas.Token(access_token=encoded_jwt, token_type="bearer", **to_encode)
     return token.dict()
 
+
+@ttl_cache(maxsize=4096, ttl=30)
+def _decode_access_token(token: str) -> Tuple[Optional[str], Optional[Tuple[str, ...]], int]:
+    payload = jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[settings.ALGORITHM],
+        options={"verify_aud": False, "require": ["exp"]},
+    )
+    scopes = payload.get("scopes")
+    return payload.get("sub"), tuple(scopes) if scopes is not None else None, payload["exp"]
+
+
+def decode_access_token(token: str) -> Tuple[Optional[str], Optional[Tuple[str, ...]]]:
+    """Returns `(sub, scopes)` of a verified token, raises `jwt.PyJWTError` otherwise"""
+    sub, scopes, exp = _decode_access_token(token)
+    # a cached decode may outlive the token, so expiry is checked on every call
+    if exp <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return sub, scopes
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return cryptContext.verify(plain_password, hashed_password)
 
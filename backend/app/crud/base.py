@@ -1,7 +1,7 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union, Tuple
 
 from pydantic import BaseModel
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, delete
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,6 +12,9 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# dialects supporting `count(*) over ()`, the page and the total are fetched in one query
+WINDOW_COUNT_DIALECTS = ('postgresql', 'mysql')
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -22,12 +25,30 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        self.id_is_primary_key = [c.name for c in model.__table__.primary_key.columns] == ['id']
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        if self.id_is_primary_key:
+            # served from the session identity map when the row is already loaded
+            return await db.get(self.model, id)
         q = select(self.model).where(self.model.id == id)
         result: Result = await db.execute(q)
         return result.scalar()
 
+    def primary_key_filter(self, id: Any, values: Dict[str, Any]) -> Optional[List[Any]]:
+        """
+        Clauses matching a single row: `id` plus the other primary key columns taken from `values`,
+        None when `values` lacks one of them
+        """
+        clauses = [self.model.id == id]
+        for column in self.model.__table__.primary_key.columns:
+            if column.name == 'id':
+                continue
+            if column.name not in values:
+                return None
+            clauses.append(column == values[column.name])
+        return clauses
+
     # noinspection PyMethodMayBeStatic
     async def constr_query_filter(
             self, query: Any, request_params: RequestParams = None, constr_filters: Any = None, column: Any = None
@@ -50,6 +71,14 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> Tuple[List[ModelType], int]:
         query = select(self.model)
         query, query_count = await self.constr_query_filter(query, request_params, filters, self.model.id)
+        if db.get_bind().dialect.name in WINDOW_COUNT_DIALECTS:
+            result: Result = await db.execute(query.add_columns(func.count().over().label('_total')))
+            rows = result.all()
+            if rows or not request_params or request_params.skip == 0:
+                return [row[0] for row in rows], rows[0]._total if rows else 0
+            # an empty page past the end carries no total, only the count is still needed
+            total: Result = await db.execute(query_count)
+            return [], total.fetchone().count
         total: Result = await db.execute(query_count)
         result: Result = await db.execute(query)
         r = result.scalars().all()
@@ -83,6 +112,56 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def update_by_id(
+            self,
+            db: AsyncSession,
+            *,
+            id: Any,
+            obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> Optional[ModelType]:
+        """
+        Single `UPDATE ... RETURNING` when `obj_in` carries the rest of a composite primary key,
+        otherwise falls back to `get` + `update`
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        update_data = {k: v for k, v in update_data.items() if k in self.model.__table__.c}
+        clauses = self.primary_key_filter(id, update_data)
+        if not update_data or clauses is None:
+            db_obj = await self.get(db, id)
+            if not db_obj or not update_data:
+                return db_obj
+            return await self.update(db, db_obj=db_obj, obj_in=update_data)
+        q = update(self.model) \
+            .where(*clauses) \
+            .values(**update_data) \
+            .returning(*self.model.__table__.c)
+        result: Result = await db.execute(
+            select(self.model).from_statement(q).execution_options(populate_existing=True)
+        )
+        db_obj = result.scalars().one_or_none()
+        await db.commit()
+        return db_obj
+
+    async def remove_where(self, db: AsyncSession, *, id: Any, **extra: Any) -> Optional[ModelType]:
+        """
+        Deletes the row only if it also matches every `column=value` in `extra`,
+        returns None when nothing was deleted.
+        `extra` must hold the rest of a composite primary key
+        """
+        clauses = self.primary_key_filter(id, extra)
+        if clauses is None:
+            raise ValueError(f'{self.model.__name__}: remove_where requires every primary key column')
+        primary_key_names = self.model.__table__.primary_key.columns.keys()
+        clauses += [getattr(self.model, k) == v for k, v in extra.items() if k not in primary_key_names]
+        q = delete(self.model).where(*clauses).returning(*self.model.__table__.c)
+        result: Result = await db.execute(select(self.model).from_statement(q))
+        obj = result.scalars().one_or_none()
+        await db.commit()
+        return obj
+
     async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
         obj = await self.get(db, id)
         await db.delete(obj)
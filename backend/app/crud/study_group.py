@@ -1,6 +1,6 @@
 from typing import List, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,17 +17,18 @@ class CRUDStudyGroup(CRUDBase[StudyGroup, StudyGroupCreate, StudyGroupUpdate]):
             self, db: AsyncSession, obj_in: StudyGroupCreate
     ) -> List[StudyGroup]:
         scg_id = obj_in.id
-        for discipline_id in obj_in.discipline_id:
-            _obj_in = schemas.StudyGroupCreate(
-                id=scg_id,
-                discipline_id=discipline_id
-            )
-            db_obj = self.model(**_obj_in.dict())
-            db.add(db_obj)
-            await db.commit()
-            await db.refresh(db_obj)
-        scg_db_obj: Result = await db.execute(select(self.model).where(self.model.id == scg_id))
-        return scg_db_obj.scalars().all()
+        discipline_ids = obj_in.discipline_id if isinstance(obj_in.discipline_id, list) else [obj_in.discipline_id]
+        if not discipline_ids:
+            return []
+        q = insert(self.model) \
+            .values([{'id': scg_id, 'discipline_id': discipline_id} for discipline_id in discipline_ids]) \
+            .returning(*self.model.__table__.c)
+        scg_db_obj: Result = await db.execute(
+            select(self.model).from_statement(q).execution_options(populate_existing=True)
+        )
+        db_objs = scg_db_obj.scalars().all()
+        await db.commit()
+        return db_objs
 
 
 study_group = CRUDStudyGroup(StudyGroup)
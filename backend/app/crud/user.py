@@ -27,16 +27,26 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
         if isinstance(obj_in, dict):
-            update_data = obj_in
+            update_data = dict(obj_in)
         else:
             update_data = obj_in.dict(exclude_unset=True)
         if update_data.get('password'):
-            update_data.pop('password')
-            # noinspection PyUnresolvedReferences
-            update_data.update({'hashed_password': get_password_hash(obj_in.password)})
+            update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
         result = await super().update(db, db_obj=db_obj, obj_in=update_data)
         return result
 
+    async def update_by_id(
+            self, db: AsyncSession, *, id: int, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> Optional[User]:
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get('password'):
+            update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+        result = await super().update_by_id(db, id=id, obj_in=update_data)
+        return result
+
     # noinspection PyMethodMayBeStatic
     async def get_by_id(self, db: AsyncSession, *, id: int, role: str = None) -> Optional[User]:
         q = sqlalchemy.select(User)
@@ -1,11 +1,13 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Any
 
 from asyncpg_utils.databases import Database
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 
 from backend.app.core.config import settings
 
@@ -14,11 +16,41 @@ engine: AsyncEngine = engine.create_async_engine(
     future=True,
     echo=False,
     json_serializer=jsonable_encoder,
+    pool_size=settings.PG_POOL_SIZE,
+    max_overflow=settings.PG_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    connect_args={
+        'statement_cache_size': settings.PG_STATEMENT_CACHE_SIZE,
+        'prepared_statement_cache_size': settings.PG_PREPARED_STATEMENT_CACHE_SIZE,
+        'server_settings': {'jit': 'off'},
+    },
 )
 
+pg_identifier_preparer = postgresql.dialect().identifier_preparer
+
+
+def set_session_user_q(db_user: str) -> str:
+    # utility statements do not accept bind parameters, so the role name is quoted instead
+    return """set local session authorization """ + pg_identifier_preparer.quote_identifier(db_user.lower())
+
+
+class RoleSession(Session):
+    """Sync session behind AsyncSessionFactory, keeps the request database role across transactions"""
+
+
+# noinspection PyUnusedLocal
+@event.listens_for(RoleSession, 'after_begin')
+def reapply_session_user(session: Session, transaction: Any, connection: Any):
+    """`set local` ends with the transaction, so the request role is set again on every new one"""
+    db_user = session.info.get('db_user')
+    if db_user:
+        connection.execute(text(set_session_user_q(db_user)))
+
+
 AsyncSessionFactory = sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoleSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
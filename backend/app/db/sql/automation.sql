@@ -1,14 +1,20 @@
 
 
-create or replace function create_user_in_role(db_user text, hashed_password text, current_user_role text)
+create or replace function ensure_user_in_role(db_user text, hashed_password text, current_user_role text)
   returns void as $$
-declare
-    query text := 'create user ';
 begin
-    if db_user is not null and hashed_password is not null  and current_user_role  is not null then
-        query := query || db_user || ' inherit login password ' || quote_nullable(hashed_password) || ' in role ' || current_user_role;
+    if db_user is null or hashed_password is null or current_user_role is null then
+        raise exception 'ensure_user_in_role: arguments must not be null';
+    end if;
+    if not exists(select 1 from pg_roles where rolname = db_user) then
+        begin
+            execute 'create user ' || quote_ident(db_user) || ' inherit login password ' || quote_nullable(hashed_password)
+                        || ' in role ' || quote_ident(current_user_role);
+        exception
+            -- a concurrent call created the role between the check and the create
+            when duplicate_object or unique_violation then null;
+        end;
     end if;
-    execute query ;
 end
 $$ language plpgsql;
 
@@ -1,8 +1,13 @@
 create index if not exists user_email_index on "user" using btree (email);
 create index if not exists user_full_name_index on "user" using btree (full_name);
+create index if not exists user_username_lower_index on "user" using btree (lower(username) text_pattern_ops);
+create index if not exists user_email_lower_index on "user" using btree (lower(email) text_pattern_ops);
+create index if not exists user_full_name_lower_index on "user" using btree (lower(full_name) text_pattern_ops);
+create index if not exists user_id_cover_index on "user" using btree (id) include (is_active, is_superuser);
 
 create index if not exists task_title on task using btree (title);
 create index if not exists task_description on task using btree (description);
+create index if not exists task_title_lower_index on task using btree (lower(title) text_pattern_ops);
 
 create index if not exists task_title on task using btree (title);
 create index if not exists task_description on task using btree (description);
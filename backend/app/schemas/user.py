@@ -55,14 +55,18 @@ class UserBase(BaseModel):
 
 
 # Properties to receive via API on creation
+def check_password(value: str) -> str:
+    assert re.match(password_exp, value), "Make sure the password is: 11 characters long," \
+                                          " 2 uppercase and 3 lowercase letters, 1 special letter, 2 numbers"
+    return value
+
+
 class UserCreate(UserBase):
     password: str
 
     @validator('password')
     def validate_password(cls, value):  # noqa
-        assert re.match(password_exp, value), "Make sure the password is: 11 characters long," \
-                                              " 2 uppercase and 3 lowercase letters, 1 special letter, 2 numbers"
-        return value
+        return check_password(value)
 
 
 # Properties to receive via API on update
@@ -70,6 +74,16 @@ class UserUpdate(UserBase):
     pass
 
 
+# Properties the current user may change on their own account
+class UserUpdateMe(BaseModel):
+    password: Optional[str]
+    email: Optional[EmailStr]
+
+    @validator('password')
+    def validate_password(cls, value):  # noqa
+        return check_password(value) if value is not None else value
+
+
 class UserInDBBase(UserBase):
     id: Optional[int] = None
 
@@ -0,0 +1,21 @@
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def serialize_orm(obj: Any, schema: Type[BaseModel]) -> dict:
+    """Rows loaded from the database are already typed, so the schema is constructed without validation"""
+    values = {name: getattr(obj, name, field.default) for name, field in schema.__fields__.items()}
+    return schema.construct(**values).dict()
+
+
+def serialize_orm_list(objs: Iterable[Any], schema: Type[BaseModel]) -> List[dict]:
+    return [serialize_orm(obj, schema) for obj in objs]
+
+
+def paginated_response(objs: List[Any], schema: Type[BaseModel], skip: int, total: int) -> ORJSONResponse:
+    """Serialized page with the react-admin `Content-Range: start-end/total` header"""
+    response = ORJSONResponse(serialize_orm_list(objs, schema))
+    response.raw_headers.append((b'content-range', b'%d-%d/%d' % (skip, skip + len(objs), total)))
+    return response